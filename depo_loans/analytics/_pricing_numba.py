@@ -0,0 +1,52 @@
+import math
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional, see the NumPy versions below
+    HAVE_NUMBA = False
+
+if HAVE_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def price_ytm(times, amounts, ytm):
+        """Present value of cashflows continuously discounted at a flat yield"""
+        price = 0.0
+        for i in range(times.shape[0]):
+            price += amounts[i] * math.exp(-ytm * times[i])
+        return price
+
+    @njit(cache=True, fastmath=True)
+    def price_and_dprice(times, amounts, ytm):
+        """price_ytm and its analytic yield derivative in a single pass"""
+        price = 0.0
+        dprice = 0.0
+        for i in range(times.shape[0]):
+            pv = amounts[i] * math.exp(-ytm * times[i])
+            price += pv
+            dprice -= times[i] * pv
+        return price, dprice
+
+    @njit(parallel=True, cache=True, fastmath=True)
+    def price_batch(times, amounts, ytms, out):
+        """price_ytm for each row of zero-padded 2-D cashflow arrays, rows in parallel"""
+        for i in prange(times.shape[0]):
+            price = 0.0
+            for j in range(times.shape[1]):
+                price += amounts[i, j] * math.exp(-ytms[i] * times[i, j])
+            out[i] = price
+else:
+    # Uncompiled, the loops above would run in the interpreter; the
+    # equivalent array expressions are one vector exp and a reduction
+    def price_ytm(times, amounts, ytm):
+        """Present value of cashflows continuously discounted at a flat yield"""
+        return float((amounts * np.exp(-ytm * times)).sum())
+
+    def price_and_dprice(times, amounts, ytm):
+        """price_ytm and its analytic yield derivative in a single pass"""
+        pv = amounts * np.exp(-ytm * times)
+        return float(pv.sum()), float(-(times * pv).sum())
+
+    def price_batch(times, amounts, ytms, out):
+        """price_ytm for each row of zero-padded 2-D cashflow arrays"""
+        out[:] = (amounts * np.exp(-ytms[:, None] * times)).sum(axis=1, dtype=np.float64)
@@ -1,28 +1,37 @@
 from datetime import date
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, List, Tuple
 import numpy as np
-from dateutil.relativedelta import relativedelta
 from ..models.base import PaymentFrequency
 
 class CurveUtils:
     @staticmethod
     def interpolate_rate(curve: Dict[str, float], target_tenor: float) -> float:
         """Linear interpolation of rates"""
-        tenors = sorted([(CurveUtils._tenor_to_years(k), v) for k, v in curve.items()])
+        tenors, rates = CurveUtils.curve_arrays(curve)
         
-        # Find surrounding points
-        for i in range(len(tenors)-1):
-            if tenors[i][0] <= target_tenor <= tenors[i+1][0]:
-                x1, y1 = tenors[i]
-                x2, y2 = tenors[i+1]
-                return y1 + (y2-y1) * (target_tenor-x1)/(x2-x1)
-                
-        # Extrapolate if outside range
-        if target_tenor < tenors[0][0]:
-            return tenors[0][1]
-        return tenors[-1][1]
+        # np.interp extrapolates flat outside the curve range
+        return float(np.interp(target_tenor, tenors, rates))
 
     @staticmethod
+    def curve_arrays(curve: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Curve as (tenors in years, rates) arrays sorted by tenor"""
+        return CurveUtils._curve_arrays(tuple(curve.items()))
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _curve_arrays(points: Tuple[Tuple[str, float], ...]) -> Tuple[np.ndarray, np.ndarray]:
+        tenors = sorted([(CurveUtils._tenor_to_years(k), v) for k, v in points])
+        years = np.array([t for t, _ in tenors], dtype=np.float64)
+        rates = np.array([r for _, r in tenors], dtype=np.float64)
+        
+        # Cached arrays are shared between callers
+        years.flags.writeable = False
+        rates.flags.writeable = False
+        return years, rates
+
+    @staticmethod
+    @lru_cache(maxsize=128)
     def _tenor_to_years(tenor: str) -> float:
         """Convert tenor string to years"""
         value = float(tenor[:-1])
@@ -42,25 +51,48 @@ class CurveUtils:
     def generate_schedule(start_date: date, end_date: date, 
                          frequency: PaymentFrequency) -> List[date]:
         """Generate payment schedule"""
-        dates = []
-        current = start_date
-        
-        freq_map = {
-            PaymentFrequency.MONTHLY: relativedelta(months=1),
-            PaymentFrequency.QUARTERLY: relativedelta(months=3),
-            PaymentFrequency.SEMI_ANNUAL: relativedelta(months=6),
-            PaymentFrequency.ANNUAL: relativedelta(years=1)
+        return CurveUtils.generate_schedule_array(start_date, end_date, frequency).tolist()
+
+    @staticmethod
+    def generate_schedule_array(start_date: date, end_date: date,
+                                frequency: PaymentFrequency) -> np.ndarray:
+        """Generate payment schedule as a datetime64[D] array"""
+        months_map = {
+            PaymentFrequency.MONTHLY: 1,
+            PaymentFrequency.QUARTERLY: 3,
+            PaymentFrequency.SEMI_ANNUAL: 6,
+            PaymentFrequency.ANNUAL: 12
         }
         
-        delta = freq_map.get(frequency)
-        if not delta:
+        months_step = months_map.get(frequency)
+        if not months_step:
             raise ValueError(f"Unsupported frequency: {frequency}")
             
-        while current <= end_date:
-            dates.append(current)
-            current += delta
+        # Step whole months from the start, clamping to the end of the month
+        total_months = (end_date.year - start_date.year) * 12 + \
+            end_date.month - start_date.month
+        months = np.datetime64(start_date, 'M') + \
+            np.arange(total_months // months_step + 1) * months_step
+        month_starts = months.astype('datetime64[D]')
+        month_lengths = ((months + 1).astype('datetime64[D]') - month_starts).astype(np.int64)
+        dates = month_starts + (np.minimum(start_date.day, month_lengths) - 1)
+        dates = dates[dates <= np.datetime64(end_date, 'D')]
             
-        if dates[-1] != end_date:
-            dates.append(end_date)
+        if dates[-1] != np.datetime64(end_date, 'D'):
+            dates = np.append(dates, np.datetime64(end_date, 'D'))
             
-        return dates 
\ No newline at end of file
+        return dates
+
+class DiscountCurve:
+    """Tenor curve prepared for vectorized rate and discount factor lookups"""
+    def __init__(self, curve: Dict[str, float]):
+        # Parsed and sorted once per distinct curve, see CurveUtils.curve_arrays
+        self.tenors, self.rates = CurveUtils.curve_arrays(curve)
+
+    def zero_rates(self, times: np.ndarray) -> np.ndarray:
+        """Linearly interpolated rates, flat beyond the curve ends"""
+        return np.interp(times, self.tenors, self.rates)
+
+    def discount_factors(self, times: np.ndarray) -> np.ndarray:
+        times = np.asarray(times, dtype=np.float64)
+        return np.exp(-self.zero_rates(times) * times)
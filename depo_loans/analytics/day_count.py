@@ -1,20 +1,58 @@
 from datetime import date
+import numpy as np
 from ..models.base import DayCountConvention
 
 class DayCountCalculator:
     def calculate_dcf(self, start_date: date, end_date: date, 
                      convention: DayCountConvention) -> float:
-        if convention == DayCountConvention.ACT_360:
+        if convention is DayCountConvention.ACT_360:
             return self._actual_days(start_date, end_date) / 360
-        elif convention == DayCountConvention.ACT_365:
+        elif convention is DayCountConvention.ACT_365:
             return self._actual_days(start_date, end_date) / 365
-        elif convention == DayCountConvention.THIRTY_360:
+        elif convention is DayCountConvention.THIRTY_360:
             return self._thirty_360_days(start_date, end_date) / 360
-        elif convention == DayCountConvention.ACT_ACT:
+        elif convention is DayCountConvention.ACT_ACT:
             return self._actual_actual(start_date, end_date)
         else:
             raise ValueError(f"Unsupported day count convention: {convention}")
 
+    def calculate_dcfs(self, start_dates: np.ndarray, end_dates: np.ndarray,
+                       convention: DayCountConvention) -> np.ndarray:
+        """Day count fractions for datetime64[D] arrays of period bounds"""
+        if convention is DayCountConvention.ACT_360:
+            return self._actual_days_array(start_dates, end_dates) / 360
+        elif convention is DayCountConvention.ACT_365:
+            return self._actual_days_array(start_dates, end_dates) / 365
+        elif convention is DayCountConvention.THIRTY_360:
+            return self._thirty_360_days_array(start_dates, end_dates) / 360
+        
+        # Remaining conventions are evaluated period by period
+        return np.array([
+            self.calculate_dcf(start, end, convention)
+            for start, end in zip(start_dates.tolist(), end_dates.tolist())
+        ], dtype=np.float64)
+
+    def _actual_days_array(self, start_dates: np.ndarray, 
+                           end_dates: np.ndarray) -> np.ndarray:
+        return (end_dates - start_dates).astype(np.int64)
+
+    def _thirty_360_days_array(self, start_dates: np.ndarray, 
+                               end_dates: np.ndarray) -> np.ndarray:
+        y1, m1, d1 = self._year_month_day(start_dates)
+        y2, m2, d2 = self._year_month_day(end_dates)
+        
+        # Same adjustments as _thirty_360_days, without per-period branches
+        d1 = np.minimum(d1, 30)
+        d2 = np.where(d1 >= 30, np.minimum(d2, 30), d2)
+            
+        return (360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1))
+
+    def _year_month_day(self, dates: np.ndarray) -> tuple:
+        months = dates.astype('datetime64[M]')
+        years = months.astype('datetime64[Y]').astype(np.int64) + 1970
+        return (years, months.astype(np.int64) % 12 + 1,
+                (dates - months).astype(np.int64) + 1)
+
     def _actual_days(self, start_date: date, end_date: date) -> int:
         return (end_date - start_date).days
 
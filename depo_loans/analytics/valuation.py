@@ -1,115 +1,206 @@
-from datetime import date, timedelta
-from typing import List, Dict
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 import numpy as np
-from scipy.stats import norm
-from dateutil.relativedelta import relativedelta
+from scipy.special import ndtr
 from ..models.base import BaseInstrument, RateType, PaymentFrequency, DayCountConvention
 from ..models.deposits import TimeDeposit, InterestRate
+from ..models.rate_features import FloaterType
 from ..models.loans import TermLoan
 from .day_count import DayCountCalculator
+from .curve_utils import CurveUtils, DiscountCurve
+
+def _kernels():
+    """Pricing kernels, imported on first use since compiling them loads numba"""
+    from . import _pricing_numba
+    return _pricing_numba
 
 class CashFlow:
+    __slots__ = ('payment_date', 'amount', 'payment_type')
+
     def __init__(self, payment_date: date, amount: float, payment_type: str):
         self.payment_date = payment_date
         self.amount = amount
         self.payment_type = payment_type
 
+PAYMENT_TYPES = ("INTEREST", "PRINCIPAL")
+CASHFLOW_DTYPE = np.dtype([('date', 'datetime64[D]'), ('amount', 'f8'), ('type', 'u1')])
+
+@dataclass
+class CashFlowStream:
+    """Projected cashflows as parallel arrays in payment date order"""
+    dates: np.ndarray    # datetime64[D]
+    amounts: np.ndarray  # float64
+    kinds: np.ndarray    # uint8 index into PAYMENT_TYPES
+
+    def years_from(self, start_date: date) -> np.ndarray:
+        """ACT/365 year fractions from start_date to each payment date"""
+        return (self.dates - np.datetime64(start_date, 'D')).astype(np.float64) / 365
+
+    def between(self, start_date: Optional[date] = None,
+                end_date: Optional[date] = None) -> 'CashFlowStream':
+        """Cashflows paid within [start_date, end_date], either bound optional"""
+        lo = np.searchsorted(self.dates, np.datetime64(start_date, 'D')) \
+            if start_date else 0
+        hi = np.searchsorted(self.dates, np.datetime64(end_date, 'D'), side='right') \
+            if end_date else len(self.dates)
+        return CashFlowStream(dates=self.dates[lo:hi], amounts=self.amounts[lo:hi],
+                              kinds=self.kinds[lo:hi])
+
+    def to_records(self) -> np.ndarray:
+        """The stream as one CASHFLOW_DTYPE structured array"""
+        records = np.empty(len(self.dates), dtype=CASHFLOW_DTYPE)
+        records['date'] = self.dates
+        records['amount'] = self.amounts
+        records['type'] = self.kinds
+        return records
+
+    def to_cashflows(self) -> List[CashFlow]:
+        return [
+            CashFlow(payment_date=d, amount=a, payment_type=PAYMENT_TYPES[k])
+            for d, a, k in zip(self.dates.tolist(), self.amounts.tolist(), 
+                               self.kinds.tolist())
+        ]
+
 class ValuationEngine:
+    STREAM_CACHE_SIZE = 4096
+
     def __init__(self):
         self.day_count_calculator = DayCountCalculator()
+        self._stream_cache: Dict[tuple, CashFlowStream] = {}
 
     def calculate_present_value(self, instrument: BaseInstrument, valuation_date: date, 
                               discount_curve: Dict[str, float]) -> float:
-        cashflows = self.project_cashflows(instrument)
-        return self._discount_cashflows(cashflows, discount_curve, valuation_date)
+        stream = self.project_cashflow_stream(instrument)
+        return self._discount_cashflows(stream, discount_curve, valuation_date)
 
     def project_cashflows(self, instrument: BaseInstrument) -> List[CashFlow]:
+        return self.project_cashflow_stream(instrument).to_cashflows()
+
+    def project_cashflow_stream(self, instrument: BaseInstrument) -> CashFlowStream:
         if isinstance(instrument, TimeDeposit):
-            return self._project_deposit_cashflows(instrument)
+            # Streams are shared between calls, so their arrays are read-only
+            key = self._deposit_projection_key(instrument)
+            stream = self._stream_cache.get(key)
+            if stream is None:
+                stream = self._project_deposit_cashflows(instrument)
+                for arr in (stream.dates, stream.amounts, stream.kinds):
+                    arr.flags.writeable = False
+                if len(self._stream_cache) >= self.STREAM_CACHE_SIZE:
+                    del self._stream_cache[next(iter(self._stream_cache))]
+                self._stream_cache[key] = stream
+            return stream
         elif isinstance(instrument, TermLoan):
             return self._project_loan_cashflows(instrument)
         else:
             raise ValueError(f"Unsupported instrument type: {type(instrument)}")
 
-    def _project_deposit_cashflows(self, deposit: TimeDeposit) -> List[CashFlow]:
-        cashflows = []
-        current_date = deposit.issue_date
+    def _deposit_projection_key(self, deposit: TimeDeposit) -> tuple:
+        """Every input the projection depends on; rate features are frozen"""
+        ir = deposit.interest_rate
+        return (deposit.issue_date, deposit.maturity_date, deposit.payment_frequency,
+                deposit.day_count_convention, deposit.principal,
+                ir.type, ir.value, ir.spread, ir.cap, ir.floor,
+                tuple(ir.step_up_schedule or ()), ir.floater_type, ir.inverse_spec)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _payment_schedule(issue_date: date, maturity_date: date,
+                          frequency: PaymentFrequency, 
+                          convention: DayCountConvention) -> Tuple[np.ndarray, ...]:
+        """Read-only period starts, ends and day count fractions, keyed on the schedule terms"""
+        # The schedule starts at the issue date, which is not a payment date
+        dates = CurveUtils.generate_schedule_array(issue_date, maturity_date, frequency)
+        starts, ends = dates[:-1], dates[1:]
+        dcfs = np.asarray(DayCountCalculator().calculate_dcfs(starts, ends, convention), 
+                          dtype=np.float64)
+        for arr in (starts, ends, dcfs):
+            arr.flags.writeable = False
+        return starts, ends, dcfs
+
+    def _project_deposit_cashflows(self, deposit: TimeDeposit) -> CashFlowStream:
+        starts, ends, dcfs = self._payment_schedule(
+            deposit.issue_date, deposit.maturity_date,
+            deposit.payment_frequency, deposit.day_count_convention)
+        n = len(ends)
         
-        # Generate payment dates
-        payment_dates = self._generate_payment_dates(
-            deposit.issue_date,
-            deposit.maturity_date,
-            deposit.payment_frequency
-        )
+        # Period interest rates considering caps and floors
+        rates = self._calculate_period_rates(deposit.interest_rate, starts, ends)
         
-        for i, payment_date in enumerate(payment_dates):
-            # Calculate period interest rate considering caps and floors
-            rate = self._calculate_period_rate(
-                deposit.interest_rate,
-                current_date,
-                payment_date
-            )
-            
-            # Calculate day count fraction
-            dcf = self.day_count_calculator.calculate_dcf(
-                current_date,
-                payment_date,
-                deposit.day_count_convention
-            )
-            
-            # Calculate interest amount
-            interest_amount = deposit.principal * rate * dcf
-            
-            # Add interest cashflow
-            cashflows.append(CashFlow(
-                payment_date=payment_date,
-                amount=interest_amount,
-                payment_type="INTEREST"
-            ))
-            
-            # Add principal repayment at maturity
-            if payment_date == deposit.maturity_date:
-                cashflows.append(CashFlow(
-                    payment_date=payment_date,
-                    amount=deposit.principal,
-                    payment_type="PRINCIPAL"
-                ))
-            
-            current_date = payment_date
+        # Interest cashflows, plus the principal repayment at maturity
+        has_principal = n > 0 and ends[-1] == np.datetime64(deposit.maturity_date, 'D')
+        size = n + 1 if has_principal else n
+        dates = np.empty(size, dtype='datetime64[D]')
+        amounts = np.empty(size, dtype=np.float64)
+        kinds = np.zeros(size, dtype=np.uint8)
         
-        return cashflows
+        dates[:n] = ends
+        amounts[:n] = deposit.principal * rates * dcfs
+        if has_principal:
+            dates[n] = deposit.maturity_date
+            amounts[n] = deposit.principal
+            kinds[n] = PAYMENT_TYPES.index("PRINCIPAL")
+        
+        return CashFlowStream(dates=dates, amounts=amounts, kinds=kinds)
 
-    def _calculate_period_rate(self, interest_rate: InterestRate, 
-                             start_date: date, end_date: date) -> float:
+    def _calculate_period_rates(self, interest_rate: InterestRate,
+                                start_dates: np.ndarray, 
+                                end_dates: np.ndarray) -> np.ndarray:
         rate = interest_rate.value
         
-        if interest_rate.type == RateType.FLOATING:
-            rate += interest_rate.spread or 0
+        if interest_rate.type is RateType.FLOATING:
+            spec = interest_rate.inverse_spec
+            if interest_rate.floater_type is FloaterType.INVERSE and spec:
+                # value is the reference fixing; the coupon moves against it
+                rate = spec.constant + spec.multiplier * rate
+                if spec.cap is not None:
+                    rate = min(rate, spec.cap)
+                if spec.floor is not None:
+                    rate = max(rate, spec.floor)
+            else:
+                rate += interest_rate.spread or 0
+        rates = np.full(start_dates.shape, rate, dtype=np.float64)
+        
+        # Step-up rates apply to periods paid on or after their effective date
+        if interest_rate.type is RateType.STEP_UP and interest_rate._stepup_dates.size:
+            steps = np.searchsorted(interest_rate._stepup_dates, end_dates, side='right')
+            rates = np.where(steps > 0, interest_rate._stepup_rates[steps - 1], rates)
             
-        # Apply cap if exists and is applicable
-        if interest_rate.cap and (not interest_rate.cap.start_date or 
-            start_date >= interest_rate.cap.start_date) and (
-            not interest_rate.cap.end_date or end_date <= interest_rate.cap.end_date):
-            rate = min(rate, interest_rate.cap.cap_rate)
+        # Flat caps and floors apply to every period; only windowed ones need a mask
+        cap = interest_rate.cap
+        if cap and (cap.start_date or cap.end_date):
+            cap_active = self._window_mask(cap.start_date, cap.end_date,
+                                           start_dates, end_dates)
+            rates = np.minimum(np.where(cap_active, cap.cap_rate, np.inf), rates)
+        elif cap:
+            rates = np.minimum(rates, cap.cap_rate)
             
-        # Apply floor if exists and is applicable
-        if interest_rate.floor and (not interest_rate.floor.start_date or 
-            start_date >= interest_rate.floor.start_date) and (
-            not interest_rate.floor.end_date or end_date <= interest_rate.floor.end_date):
-            rate = max(rate, interest_rate.floor.floor_rate)
+        floor = interest_rate.floor
+        if floor and (floor.start_date or floor.end_date):
+            floor_active = self._window_mask(floor.start_date, floor.end_date,
+                                             start_dates, end_dates)
+            rates = np.maximum(np.where(floor_active, floor.floor_rate, -np.inf), rates)
+        elif floor:
+            rates = np.maximum(rates, floor.floor_rate)
             
-        return rate
+        return rates
+
+    def _window_mask(self, window_start: Optional[date], window_end: Optional[date],
+                     start_dates: np.ndarray, end_dates: np.ndarray) -> np.ndarray:
+        """Periods falling inside an optional [window_start, window_end] window"""
+        active = np.ones(start_dates.shape, dtype=bool)
+        if window_start:
+            active &= start_dates >= np.datetime64(window_start, 'D')
+        if window_end:
+            active &= end_dates <= np.datetime64(window_end, 'D')
+        return active
 
-    def _discount_cashflows(self, cashflows: List[CashFlow], 
+    def _discount_cashflows(self, stream: CashFlowStream, 
                           discount_curve: Dict[str, float], 
                           valuation_date: date) -> float:
-        pv = 0.0
-        for cf in cashflows:
-            years = self._calculate_years_fraction(valuation_date, cf.payment_date)
-            discount_rate = self._interpolate_rate(discount_curve, years)
-            discount_factor = np.exp(-discount_rate * years)
-            pv += cf.amount * discount_factor
-        return pv
+        years = stream.years_from(valuation_date)
+        return float((stream.amounts * self._curve_discount_factors(discount_curve, years)).sum())
 
     def calculate_option_adjusted_value(self, deposit: TimeDeposit,
                                      valuation_date: date,
@@ -121,87 +212,160 @@ class ValuationEngine:
         # Calculate straight PV
         straight_pv = self.calculate_present_value(deposit, valuation_date, discount_curve)
         
-        # Calculate call option values
-        total_option_value = 0
-        for call_option in deposit.call_schedule:
-            if call_option.call_date > valuation_date:
-                option_value = self._calculate_call_option_value(
-                    strike=call_option.call_price * deposit.principal,
-                    maturity=call_option.call_date,
-                    valuation_date=valuation_date,
-                    discount_curve=discount_curve,
-                    volatility=volatility,
-                    forward_price=straight_pv
-                )
-                total_option_value += option_value
+        # Value the call options still ahead of the valuation date together
+        live_calls = [call_option for call_option in deposit.call_schedule
+                      if call_option.call_date > valuation_date]
+        strikes = np.array([call_option.call_price for call_option in live_calls],
+                           dtype=np.float64) * deposit.principal
+        expiries = np.array([
+            self._calculate_years_fraction(valuation_date, call_option.call_date)
+            for call_option in live_calls
+        ], dtype=np.float64)
+        
+        option_values = self._calculate_call_option_values(
+            strikes=strikes,
+            expiries=expiries,
+            discount_curve=discount_curve,
+            volatility=volatility,
+            forward_price=straight_pv
+        )
                 
-        return straight_pv - total_option_value
-
-    def _calculate_call_option_value(self, strike: float, maturity: date,
-                                   valuation_date: date, discount_curve: Dict[str, float],
-                                   volatility: float, forward_price: float) -> float:
-        T = self._calculate_years_fraction(valuation_date, maturity)
-        if T <= 0:
-            return 0
-            
-        r = self._interpolate_rate(discount_curve, T)
+        return straight_pv - float(option_values.sum())
+
+    def _calculate_call_option_values(self, strikes: np.ndarray, expiries: np.ndarray,
+                                      discount_curve: Dict[str, float],
+                                      volatility: float, 
+                                      forward_price: float) -> np.ndarray:
+        """Black-Scholes values of calls with positive expiries, in one pass"""
+        r = DiscountCurve(discount_curve).zero_rates(expiries)
+        vol_sqrt_t = volatility * np.sqrt(expiries)
         
-        d1 = (np.log(forward_price/strike) + (r + volatility**2/2) * T) / (volatility * np.sqrt(T))
-        d2 = d1 - volatility * np.sqrt(T)
+        d1 = (np.log(forward_price/strikes) + (r + volatility**2/2) * expiries) / vol_sqrt_t
+        d2 = d1 - vol_sqrt_t
         
-        return forward_price * norm.cdf(d1) - strike * np.exp(-r * T) * norm.cdf(d2) 
+        return forward_price * ndtr(d1) - strikes * np.exp(-r * expiries) * ndtr(d2)
 
     def calculate_yield_to_maturity(self, instrument: BaseInstrument, 
                                   market_price: float, 
-                                  initial_guess: float = 0.05) -> float:
-        """Calculate yield to maturity using Newton-Raphson method"""
-        def price_difference(ytm):
-            return self._calculate_price_with_ytm(instrument, ytm) - market_price
-            
-        def price_derivative(ytm):
-            delta = 0.0001
-            return (price_difference(ytm + delta) - price_difference(ytm)) / delta
-            
-        # Newton-Raphson iteration
-        ytm = initial_guess
-        for _ in range(100):  # Max iterations
-            diff = price_difference(ytm)
-            if abs(diff) < 1e-6:
-                break
-            ytm = ytm - diff / price_derivative(ytm)
-            
-        return ytm
+                                  initial_guess: Optional[float] = None) -> float:
+        """Calculate yield to maturity using Newton-Raphson, falling back to Brent's method"""
+        times, amounts = self._cashflow_arrays(instrument)
+        return self._solve_flat_rate(times, amounts, market_price, initial_guess,
+                                     "Yield to maturity")
 
     def calculate_duration_convexity(self, instrument: BaseInstrument, 
                                    yield_rate: float) -> tuple:
         """Calculate modified duration and convexity"""
-        price = self._calculate_price_with_ytm(instrument, yield_rate)
-        delta_y = 0.0001
-        
-        price_up = self._calculate_price_with_ytm(instrument, yield_rate + delta_y)
-        price_down = self._calculate_price_with_ytm(instrument, yield_rate - delta_y)
+        times, amounts = self._cashflow_arrays(instrument)
+        discounted = amounts * np.exp(-yield_rate * times)
+        price = discounted.sum()
         
-        modified_duration = -(price_up - price_down) / (2 * delta_y * price)
-        convexity = (price_up + price_down - 2 * price) / (delta_y * delta_y * price)
+        # Closed forms of -P'/P and P''/P for continuous discounting
+        modified_duration = (times * discounted).sum() / price
+        convexity = (times * times * discounted).sum() / price
         
         return modified_duration, convexity
 
     def calculate_z_spread(self, instrument: BaseInstrument, 
                           market_price: float,
                           discount_curve: Dict[str, float],
-                          initial_guess: float = 0.01) -> float:
-        """Calculate Z-spread using Newton-Raphson method"""
-        def price_difference(z_spread):
-            return self._calculate_price_with_spread(
-                instrument, discount_curve, z_spread) - market_price
-                
-        # Newton-Raphson iteration
-        z_spread = initial_guess
-        for _ in range(100):
-            diff = price_difference(z_spread)
-            if abs(diff) < 1e-6:
-                break
-            derivative = (price_difference(z_spread + 0.0001) - diff) / 0.0001
-            z_spread = z_spread - diff / derivative
+                          initial_guess: Optional[float] = None) -> float:
+        """Calculate Z-spread using Newton-Raphson, falling back to Brent's method"""
+        times, amounts = self._cashflow_arrays(instrument)
+        # Discounting on the curve does not depend on the spread, so the
+        # spread is the flat rate that prices the curve-discounted cashflows
+        discounted = amounts * self._curve_discount_factors(discount_curve, times)
+        return self._solve_flat_rate(times, discounted, market_price, initial_guess,
+                                     "Z-spread")
+
+    def _solve_flat_rate(self, times: np.ndarray, amounts: np.ndarray, 
+                         market_price: float, initial_guess: Optional[float],
+                         name: str) -> float:
+        """Flat continuous rate pricing the cashflows at market_price"""
+        # Bullet deposits paying everything on one date solve in closed form
+        if times.size and times[0] > 0 and market_price > 0 and \
+                np.all(times == times[0]):
+            return float(np.log(amounts.sum() / market_price) / times[0])
             
-        return z_spread 
\ No newline at end of file
+        # Seed with the continuously compounded total return to maturity,
+        # close enough to the root for Newton to converge in a few steps
+        total = amounts.sum()
+        seed = float(np.log(total / market_price) / times[-1]) \
+            if total > 0 and market_price > 0 and times[-1] > 0 else 0.05
+        rate = seed if initial_guess is None else initial_guess
+        kernels = _kernels()
+        
+        # Newton-Raphson iteration with the analytic price derivative
+        for _ in range(8):
+            price, dprice = kernels.price_and_dprice(times, amounts, rate)
+            diff = price - market_price
+            if abs(diff) < 1e-6:
+                return rate
+            step = diff / dprice
+            rate = rate - step
+            if abs(step) < 1e-10:
+                return rate
+        
+        # Newton failed: bracket the root around the seed, widening until the
+        # price difference changes sign, and solve with Brent's method
+        from scipy.optimize import brentq  # scipy.optimize is slow to import
+        
+        def f(y):
+            return kernels.price_ytm(times, amounts, y) - market_price
+        
+        width = 0.05
+        for _ in range(10):
+            lo, hi = seed - width, seed + width
+            if f(lo) * f(hi) <= 0:
+                return brentq(f, lo, hi, xtol=1e-10)
+            width *= 2
+        raise ValueError(f"{name} did not converge")
+
+    def price_portfolio(self, instruments: List[BaseInstrument],
+                        yields: List[float], dtype=np.float64) -> np.ndarray:
+        """Price each instrument at its yield, instruments priced in parallel"""
+        # The compiled kernel does not bounds-check, so shapes are checked here
+        ytms = np.asarray(yields, dtype=dtype)
+        if ytms.shape != (len(instruments),):
+            raise ValueError(f"Expected {len(instruments)} yields, got shape {ytms.shape}")
+        times, amounts = self._portfolio_arrays(instruments)
+        
+        # float32 halves memory traffic for large PV sweeps; sums stay float64
+        prices = np.empty(len(instruments), dtype=np.float64)
+        _kernels().price_batch(times.astype(dtype), amounts.astype(dtype), ytms, prices)
+        return prices
+
+    def _portfolio_arrays(self, instruments: List[BaseInstrument]) -> tuple:
+        """Stack cashflow arrays into 2-D arrays, padding short rows with zeros"""
+        rows = [self._cashflow_arrays(instrument) for instrument in instruments]
+        width = max((row_times.size for row_times, _ in rows), default=0)
+        times = np.zeros((len(rows), width), dtype=np.float64)
+        amounts = np.zeros((len(rows), width), dtype=np.float64)
+        for i, (row_times, row_amounts) in enumerate(rows):
+            times[i, :row_times.size] = row_times
+            amounts[i, :row_amounts.size] = row_amounts
+        return times, amounts
+
+    def _calculate_price_with_ytm(self, instrument: BaseInstrument, 
+                                  ytm: float) -> float:
+        times, amounts = self._cashflow_arrays(instrument)
+        return _kernels().price_ytm(times, amounts, ytm)
+
+    def _calculate_price_with_spread(self, instrument: BaseInstrument,
+                                     discount_curve: Dict[str, float],
+                                     z_spread: float) -> float:
+        times, amounts = self._cashflow_arrays(instrument)
+        discounted = amounts * self._curve_discount_factors(discount_curve, times)
+        return _kernels().price_ytm(times, discounted, z_spread)
+
+    def _cashflow_arrays(self, instrument: BaseInstrument) -> tuple:
+        """Project cashflows into (times, amounts) arrays measured from issue"""
+        stream = self.project_cashflow_stream(instrument)
+        return stream.years_from(instrument.issue_date), stream.amounts
+
+    def _curve_discount_factors(self, discount_curve: Dict[str, float],
+                                times: np.ndarray) -> np.ndarray:
+        return DiscountCurve(discount_curve).discount_factors(times)
+
+    def _calculate_years_fraction(self, start_date: date, end_date: date) -> float:
+        return (end_date - start_date).days / 365
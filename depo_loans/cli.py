@@ -17,7 +17,6 @@ from .models.rate_features import (
     FloaterType
 )
 from .analytics.valuation import ValuationEngine
-from .analytics.credit_risk import CreditRiskAnalytics
 
 @click.group()
 def cli():
@@ -44,7 +43,8 @@ def analyze(instrument_file: str, valuation_date: datetime,
     # Create instrument
     instrument = create_instrument_from_json(instrument_data)
     
-    # Initialize analytics engines
+    # Initialize analytics engines; credit analytics are only needed here
+    from .analytics.credit_risk import CreditRiskAnalytics
     valuation_engine = ValuationEngine()
     credit_risk_analytics = CreditRiskAnalytics(
         rating_transition_matrix=market_data['rating_transitions'],
@@ -103,13 +103,13 @@ def cashflows(instrument_file: str, start_date: datetime, end_date: datetime):
     instrument = create_instrument_from_json(instrument_data)
     valuation_engine = ValuationEngine()
     
-    cashflows = valuation_engine.project_cashflows(instrument)
+    stream = valuation_engine.project_cashflow_stream(instrument)
     
-    # Filter cashflows by date if specified
-    if start_date:
-        cashflows = [cf for cf in cashflows if cf.payment_date >= start_date.date()]
-    if end_date:
-        cashflows = [cf for cf in cashflows if cf.payment_date <= end_date.date()]
+    # Filter cashflows by date if specified; the stream is in date order
+    cashflows = stream.between(
+        start_date.date() if start_date else None,
+        end_date.date() if end_date else None
+    ).to_cashflows()
     
     # Output cashflows
     for cf in cashflows:
@@ -1,18 +1,8 @@
 from dataclasses import dataclass
 from datetime import date
 from typing import Optional, List
-from .base import BaseInstrument, RateType, PaymentFrequency, DayCountConvention
-from .rate_features import RateCap, RateFloor, CallOption
-
-@dataclass
-class InterestRate:
-    type: RateType
-    value: float
-    spread: Optional[float] = None
-    reference_rate: Optional[str] = None
-    reset_frequency: Optional[PaymentFrequency] = None
-    cap: Optional[RateCap] = None
-    floor: Optional[RateFloor] = None
+from .base import BaseInstrument, PaymentFrequency, DayCountConvention
+from .rate_features import CallOption, InterestRate
 
 @dataclass
 class TimeDeposit(BaseInstrument):
@@ -1,32 +1,41 @@
+from bisect import bisect_right
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from typing import Optional, List
 from datetime import date
+import numpy as np
 from .base import RateType, PaymentFrequency
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RateCap:
     cap_rate: float
     start_date: Optional[date] = None
     end_date: Optional[date] = None
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RateFloor:
     floor_rate: float
     start_date: Optional[date] = None
     end_date: Optional[date] = None
 
+@dataclass(frozen=True, slots=True)
+class CallOption:
+    call_date: date
+    call_price: float  # As a fraction of principal
+    notice_days: int
+
 class FloaterType(Enum):
     STANDARD = "STANDARD"
     INVERSE = "INVERSE"
     RANGE = "RANGE"
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StepUpRate:
     effective_date: date
     rate: float
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class InverseFloaterSpec:
     reference_rate: str
     multiplier: float  # Typically negative for inverse floaters
@@ -34,7 +43,7 @@ class InverseFloaterSpec:
     cap: Optional[float] = None
     floor: Optional[float] = None
 
-@dataclass
+@dataclass(slots=True)
 class InterestRate:
     type: RateType
     value: float
@@ -45,4 +54,30 @@ class InterestRate:
     floor: Optional[RateFloor] = None
     step_up_schedule: Optional[List[StepUpRate]] = None
     floater_type: FloaterType = FloaterType.STANDARD
-    inverse_spec: Optional[InverseFloaterSpec] = None 
\ No newline at end of file
+    inverse_spec: Optional[InverseFloaterSpec] = None
+
+    @property
+    def _stepup_dates(self) -> np.ndarray:
+        return _step_up_arrays(tuple(self.step_up_schedule or ()))[0]
+
+    @property
+    def _stepup_rates(self) -> np.ndarray:
+        return _step_up_arrays(tuple(self.step_up_schedule or ()))[1]
+
+    def step_up_rate(self, on: date) -> float:
+        """Rate in effect on the given date under the step-up schedule"""
+        _, _, dates, rates = _step_up_arrays(tuple(self.step_up_schedule or ()))
+        idx = bisect_right(dates, on) - 1
+        return rates[idx] if idx >= 0 else self.value
+
+@lru_cache(maxsize=256)
+def _step_up_arrays(schedule: tuple) -> tuple:
+    """Step-up schedule sorted by effective date, as read-only arrays and as tuples for bisect"""
+    steps = sorted(schedule, key=lambda s: s.effective_date)
+    dates = tuple(s.effective_date for s in steps)
+    rates = tuple(s.rate for s in steps)
+    date_array = np.array(dates, dtype='datetime64[D]')
+    rate_array = np.array(rates, dtype=np.float64)
+    date_array.flags.writeable = False
+    rate_array.flags.writeable = False
+    return date_array, rate_array, dates, rates
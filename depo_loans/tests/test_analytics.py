@@ -1,9 +1,14 @@
 import unittest
 from datetime import date
+import numpy as np
 from ..models.base import RateType, PaymentFrequency, DayCountConvention, InstrumentStatus
 from ..models.deposits import TimeDeposit, InterestRate
 from ..models.rate_features import RateCap, RateFloor, CallOption, StepUpRate, FloaterType
 from ..analytics.valuation import ValuationEngine
+from ..analytics._pricing_numba import price_ytm
+from ..analytics.credit_risk import CreditRiskAnalytics
+from ..analytics.curve_utils import CurveUtils
+from ..analytics.day_count import DayCountCalculator
 
 class TestAnalytics(unittest.TestCase):
     def setUp(self):
@@ -45,22 +50,60 @@ class TestAnalytics(unittest.TestCase):
         
         cashflows = self.valuation_engine.project_cashflows(deposit)
         
-        # Verify step-up rates are applied correctly
+        # Verify step-up rates are applied correctly, accruing ACT/360
+        period_start = deposit.issue_date
         for cf in cashflows:
             if cf.payment_type == "INTEREST":
+                dcf = (cf.payment_date - period_start).days / 360
+                period_start = cf.payment_date
                 if cf.payment_date < date(2023, 7, 1):
                     self.assertAlmostEqual(
-                        cf.amount / deposit.principal / 0.25, 0.05, places=4
+                        cf.amount / deposit.principal / dcf, 0.05, places=4
                     )
                 elif cf.payment_date < date(2024, 1, 1):
                     self.assertAlmostEqual(
-                        cf.amount / deposit.principal / 0.25, 0.06, places=4
+                        cf.amount / deposit.principal / dcf, 0.06, places=4
                     )
                 else:
                     self.assertAlmostEqual(
-                        cf.amount / deposit.principal / 0.25, 0.07, places=4
+                        cf.amount / deposit.principal / dcf, 0.07, places=4
                     )
 
+    def test_schedule_keeps_month_end_anchor(self):
+        schedule = CurveUtils.generate_schedule(
+            date(2023, 1, 31), date(2023, 6, 30), PaymentFrequency.MONTHLY)
+        self.assertEqual(schedule, [
+            date(2023, 1, 31), date(2023, 2, 28), date(2023, 3, 31),
+            date(2023, 4, 30), date(2023, 5, 31), date(2023, 6, 30)
+        ])
+        
+        # Leap years clamp to Feb 29; a maturity off the schedule is appended
+        schedule = CurveUtils.generate_schedule(
+            date(2023, 11, 30), date(2024, 8, 31), PaymentFrequency.QUARTERLY)
+        self.assertEqual(schedule, [
+            date(2023, 11, 30), date(2024, 2, 29), date(2024, 5, 30),
+            date(2024, 8, 30), date(2024, 8, 31)
+        ])
+
+    def test_thirty_360_dcfs_match_single_period(self):
+        calculator = DayCountCalculator()
+        periods = [
+            (date(2023, 1, 31), date(2023, 2, 28)),
+            (date(2023, 1, 30), date(2023, 3, 31)),
+            (date(2023, 2, 28), date(2023, 3, 31)),
+            (date(2023, 3, 31), date(2023, 4, 30)),
+            (date(2023, 1, 15), date(2023, 7, 31)),
+            (date(2023, 12, 31), date(2024, 12, 31))
+        ]
+        starts = np.array([start for start, _ in periods], dtype='datetime64[D]')
+        ends = np.array([end for _, end in periods], dtype='datetime64[D]')
+        
+        dcfs = calculator.calculate_dcfs(starts, ends, DayCountConvention.THIRTY_360)
+        for dcf, (start, end) in zip(dcfs, periods):
+            self.assertEqual(
+                dcf, calculator.calculate_dcf(start, end, DayCountConvention.THIRTY_360))
+        self.assertEqual(dcfs[1], 60 / 360)
+
     def create_test_deposit(self) -> TimeDeposit:
         """Helper method to create a test deposit"""
         return TimeDeposit(
@@ -106,6 +149,37 @@ class TestAnalytics(unittest.TestCase):
         # Verify the price matches the market price
         self.assertAlmostEqual(calculated_price, market_price, places=2)
 
+    def test_ytm_single_payment_closed_form(self):
+        deposit = self.create_test_deposit()
+        deposit.payment_frequency = PaymentFrequency.ANNUAL
+        market_price = 980000
+        
+        # Interest and principal are both paid at maturity
+        times, amounts = self.valuation_engine._cashflow_arrays(deposit)
+        self.assertEqual(len(set(times.tolist())), 1)
+        
+        ytm = self.valuation_engine.calculate_yield_to_maturity(deposit, market_price)
+        self.assertAlmostEqual(price_ytm(times, amounts, ytm), market_price, places=6)
+
+    def test_ytm_falls_back_from_poor_guess(self):
+        deposit = self.create_test_deposit()
+        market_price = 980000
+        
+        ytm = self.valuation_engine.calculate_yield_to_maturity(deposit, market_price)
+        fallback = self.valuation_engine.calculate_yield_to_maturity(
+            deposit, market_price, initial_guess=5.0
+        )
+        self.assertAlmostEqual(fallback, ytm, places=8)
+        
+        # Premium prices give negative yields on either path
+        deposit.interest_rate.value = 0.01
+        ytm = self.valuation_engine.calculate_yield_to_maturity(deposit, 1030000)
+        fallback = self.valuation_engine.calculate_yield_to_maturity(
+            deposit, 1030000, initial_guess=5.0
+        )
+        self.assertLess(ytm, 0)
+        self.assertAlmostEqual(fallback, ytm, places=8)
+
     def test_z_spread_calculation(self):
         deposit = self.create_test_deposit()
         market_price = 990000
@@ -126,6 +200,52 @@ class TestAnalytics(unittest.TestCase):
         # Verify the price matches the market price
         self.assertAlmostEqual(calculated_price, market_price, places=2)
 
+    def test_z_spread_falls_back_from_poor_guess(self):
+        deposit = self.create_test_deposit()
+        deposit.maturity_date = date(2033, 1, 1)
+        market_price = 1000000
+        
+        # Newton from a 100% spread overshoots; the fallback must still reprice
+        z_spread = self.valuation_engine.calculate_z_spread(
+            deposit, market_price, self.discount_curve, initial_guess=1.0
+        )
+        calculated_price = self.valuation_engine._calculate_price_with_spread(
+            deposit, self.discount_curve, z_spread
+        )
+        self.assertAlmostEqual(calculated_price, market_price, places=2)
+        self.assertAlmostEqual(z_spread, self.valuation_engine.calculate_z_spread(
+            deposit, market_price, self.discount_curve
+        ), places=8)
+
+    def test_price_portfolio(self):
+        deposits = [self.create_test_deposit(), self.create_test_deposit()]
+        deposits[1].maturity_date = date(2023, 7, 1)
+        yields = [0.05, 0.06]
+        
+        prices = self.valuation_engine.price_portfolio(deposits, yields)
+        
+        for price, deposit, ytm in zip(prices, deposits, yields):
+            self.assertAlmostEqual(
+                price, self.valuation_engine._calculate_price_with_ytm(deposit, ytm), 
+                places=6
+            )
+
+    def test_price_portfolio_float32(self):
+        deposits = [self.create_test_deposit(), self.create_test_deposit()]
+        deposits[1].maturity_date = date(2023, 7, 1)
+        yields = [0.05, 0.06]
+        
+        prices = self.valuation_engine.price_portfolio(deposits, yields)
+        prices_32 = self.valuation_engine.price_portfolio(deposits, yields, dtype=np.float32)
+        
+        self.assertEqual(prices_32.dtype, np.float64)
+        np.testing.assert_allclose(prices_32, prices, rtol=1e-6)
+
+    def test_price_portfolio_rejects_mismatched_yields(self):
+        deposits = [self.create_test_deposit() for _ in range(3)]
+        with self.assertRaises(ValueError):
+            self.valuation_engine.price_portfolio(deposits, [0.05])
+
     def test_duration_convexity(self):
         deposit = self.create_test_deposit()
         yield_rate = 0.05
@@ -139,4 +259,91 @@ class TestAnalytics(unittest.TestCase):
         self.assertGreater(convexity, 0)
         
         # For a 1-year instrument, duration should be less than 1
-        self.assertLess(duration, 1.0) 
\ No newline at end of file
+        self.assertLess(duration, 1.0) 
+
+    def test_duration_convexity_matches_finite_differences(self):
+        deposit = self.create_test_deposit()
+        yield_rate = 0.05
+        delta_y = 0.0001
+        
+        duration, convexity = self.valuation_engine.calculate_duration_convexity(
+            deposit, yield_rate
+        )
+        
+        price = self.valuation_engine._calculate_price_with_ytm(deposit, yield_rate)
+        price_up = self.valuation_engine._calculate_price_with_ytm(
+            deposit, yield_rate + delta_y)
+        price_down = self.valuation_engine._calculate_price_with_ytm(
+            deposit, yield_rate - delta_y)
+        
+        self.assertAlmostEqual(
+            duration, -(price_up - price_down) / (2 * delta_y * price), places=6)
+        self.assertAlmostEqual(
+            convexity, (price_up + price_down - 2 * price) / (delta_y * delta_y * price),
+            places=3)
+
+    def test_step_up_rate_lookup(self):
+        rate = InterestRate(
+            type=RateType.STEP_UP,
+            value=0.05,
+            step_up_schedule=[
+                StepUpRate(date(2024, 1, 1), 0.07),
+                StepUpRate(date(2023, 7, 1), 0.06)
+            ]
+        )
+        self.assertEqual(rate.step_up_rate(date(2023, 6, 30)), 0.05)
+        self.assertEqual(rate.step_up_rate(date(2023, 7, 1)), 0.06)
+        self.assertEqual(rate.step_up_rate(date(2023, 12, 31)), 0.06)
+        self.assertEqual(rate.step_up_rate(date(2024, 1, 1)), 0.07)
+        
+        # The schedule may be replaced after construction
+        rate.step_up_schedule = [StepUpRate(date(2023, 7, 1), 0.08)]
+        self.assertEqual(rate.step_up_rate(date(2024, 1, 1)), 0.08)
+        
+        deposit = self.create_test_deposit()
+        deposit.interest_rate = rate
+        cashflows = self.valuation_engine.project_cashflows(deposit)
+        interest_cf = next(cf for cf in cashflows if cf.payment_date == date(2023, 10, 1))
+        self.assertAlmostEqual(interest_cf.amount, deposit.principal * 0.08 * 92 / 360)
+
+    def test_credit_var_matches_monte_carlo(self):
+        credit_risk = CreditRiskAnalytics({}, {}, {}, seed=42)
+        
+        # Below the 1% tail there is no loss at the 99% level
+        self.assertEqual(credit_risk._calculate_credit_var(0.005, 0.6, 1000000.0, 0.99), 0)
+        self.assertEqual(credit_risk._calculate_credit_var(
+            0.005, 0.6, 1000000.0, 0.99, method="mc"), 0)
+        
+        for pd in [0.05, 0.3]:
+            analytic_var = credit_risk._calculate_credit_var(
+                pd, 0.6, 1000000.0, 0.99
+            )
+            mc_var = credit_risk._calculate_credit_var(
+                pd, 0.6, 1000000.0, 0.99, method="mc"
+            )
+            
+            # Monte Carlo estimate should be within sampling error
+            self.assertAlmostEqual(mc_var / analytic_var, 1.0, delta=0.05)
+
+    def test_pd_batch_matches_single_instrument(self):
+        credit_risk = CreditRiskAnalytics({}, {"A": 0.02}, {})
+        deposit = self.create_test_deposit()
+        market_data = [
+            {'asset_value': 150.0, 'asset_volatility': 0.25, 
+             'debt_value': 100.0, 'risk_free_rate': 0.03},
+            {'asset_value': 0.0, 'asset_volatility': 0.25, 
+             'debt_value': 100.0, 'risk_free_rate': 0.03}
+        ]
+        
+        pds = credit_risk.calculate_pd_batch(
+            [md['asset_value'] for md in market_data],
+            [md['asset_volatility'] for md in market_data],
+            [md['debt_value'] for md in market_data],
+            [md['risk_free_rate'] for md in market_data],
+            [deposit.counterparty_rating] * len(market_data)
+        )
+        
+        for pd, md in zip(pds, market_data):
+            self.assertAlmostEqual(
+                pd, credit_risk._calculate_probability_of_default(deposit, md), places=10
+            )
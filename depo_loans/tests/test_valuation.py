@@ -1,9 +1,10 @@
 import unittest
 from datetime import date
 from ..models.deposits import TimeDeposit, InterestRate
-from ..models.rate_features import RateCap, RateFloor, CallOption
+from ..models.rate_features import (RateCap, RateFloor, CallOption, FloaterType,
+                                    InverseFloaterSpec)
 from ..models.base import RateType, PaymentFrequency, DayCountConvention, InstrumentStatus
-from ..analytics.valuation import ValuationEngine
+from ..analytics.valuation import ValuationEngine, PAYMENT_TYPES
 
 class TestValuation(unittest.TestCase):
     def setUp(self):
@@ -57,6 +58,44 @@ class TestValuation(unittest.TestCase):
         self.assertEqual(len(principal_cfs), 1)
         self.assertEqual(principal_cfs[0].amount, self.test_deposit.principal)
 
+    def test_cashflow_records(self):
+        stream = self.valuation_engine.project_cashflow_stream(self.test_deposit)
+        records = stream.to_records()
+        cashflows = stream.to_cashflows()
+        self.assertEqual(len(records), len(cashflows))
+        self.assertEqual(records[-1]['amount'], self.test_deposit.principal)
+        
+        interest = records[records['type'] == PAYMENT_TYPES.index("INTEREST")]
+        self.assertEqual(len(interest), 4)
+        self.assertAlmostEqual(interest['amount'].sum(), sum(
+            cf.amount for cf in cashflows if cf.payment_type == "INTEREST"))
+
+    def test_projection_cache(self):
+        stream = self.valuation_engine.project_cashflow_stream(self.test_deposit)
+        self.assertIs(self.valuation_engine.project_cashflow_stream(self.test_deposit), stream)
+        self.assertFalse(stream.amounts.flags.writeable)
+        
+        # Changing the rate terms projects afresh
+        self.test_deposit.interest_rate.value = 0.03
+        repriced = self.valuation_engine.project_cashflow_stream(self.test_deposit)
+        self.assertIsNot(repriced, stream)
+        self.assertLess(repriced.amounts[0], stream.amounts[0])
+
+    def test_projection_follows_schedule_changes(self):
+        self.valuation_engine.project_cashflows(self.test_deposit)
+        self.test_deposit.maturity_date = date(2024, 4, 1)
+        cashflows = self.valuation_engine.project_cashflows(self.test_deposit)
+        
+        self.assertEqual(len([cf for cf in cashflows if cf.payment_type == "INTEREST"]), 5)
+        self.assertEqual(cashflows[-1].payment_type, "PRINCIPAL")
+        self.assertEqual(cashflows[-1].payment_date, date(2024, 4, 1))
+
+    def test_rate_terms_compare_by_value(self):
+        rate = InterestRate(type=RateType.FIXED, value=0.05, cap=RateCap(cap_rate=0.07))
+        self.assertEqual(rate, InterestRate(type=RateType.FIXED, value=0.05, 
+                                            cap=RateCap(cap_rate=0.07)))
+        self.assertIn("cap_rate=0.07", repr(rate))
+
     def test_rate_caps_and_floors(self):
         # Test with rate above cap
         high_rate_deposit = self.test_deposit
@@ -74,6 +113,55 @@ class TestValuation(unittest.TestCase):
         self.assertGreater(interest_cf.amount, 
                           low_rate_deposit.principal * 0.01 * 0.25)
 
+    def test_windowed_caps_and_floors(self):
+        deposit = self.test_deposit
+        deposit.interest_rate = InterestRate(
+            type=RateType.FLOATING,
+            value=0.08,
+            reference_rate="LIBOR",
+            cap=RateCap(cap_rate=0.07, start_date=date(2023, 4, 1), 
+                        end_date=date(2023, 9, 30)),
+            floor=RateFloor(floor_rate=0.09, start_date=date(2023, 10, 1))
+        )
+        cashflows = self.valuation_engine.project_cashflows(deposit)
+        
+        # Only periods wholly inside a window are capped or floored
+        period_start = deposit.issue_date
+        rates = []
+        for cf in cashflows:
+            if cf.payment_type == "INTEREST":
+                dcf = (cf.payment_date - period_start).days / 360
+                rates.append(cf.amount / deposit.principal / dcf)
+                period_start = cf.payment_date
+        self.assertEqual(len(rates), 4)
+        for rate, expected in zip(rates, [0.08, 0.07, 0.08, 0.09]):
+            self.assertAlmostEqual(rate, expected)
+
+    def test_inverse_floater_rates(self):
+        deposit = self.test_deposit
+        deposit.interest_rate = InterestRate(
+            type=RateType.FLOATING,
+            value=0.01,
+            reference_rate="SOFR",
+            floater_type=FloaterType.INVERSE,
+            inverse_spec=InverseFloaterSpec(
+                reference_rate="SOFR",
+                multiplier=-1.0,
+                constant=0.10,
+                cap=0.08,
+                floor=0.02
+            )
+        )
+        cashflows = self.valuation_engine.project_cashflows(deposit)
+        interest_cf = next(cf for cf in cashflows if cf.payment_type == "INTEREST")
+        # 0.10 - 0.01 = 0.09, capped at 0.08 over 90/360
+        self.assertAlmostEqual(interest_cf.amount, deposit.principal * 0.08 * 90 / 360)
+
+        deposit.interest_rate.value = 0.05
+        cashflows = self.valuation_engine.project_cashflows(deposit)
+        interest_cf = next(cf for cf in cashflows if cf.payment_type == "INTEREST")
+        self.assertAlmostEqual(interest_cf.amount, deposit.principal * 0.05 * 90 / 360)
+
     def test_option_adjusted_value(self):
         discount_curve = {
             "1M": 0.04,